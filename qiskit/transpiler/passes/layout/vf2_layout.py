@@ -12,12 +12,13 @@
 
 """VF2Layout pass to find a layout using subgraph isomorphism"""
 from enum import Enum
+import itertools
 import logging
 import time
 
+import numpy as np
 from rustworkx import vf2_mapping
 
-from qiskit.transpiler.layout import Layout
 from qiskit.transpiler.basepasses import AnalysisPass
 from qiskit.transpiler.exceptions import TranspilerError
 from qiskit.transpiler.passes.layout import vf2_utils
@@ -25,6 +26,11 @@ from qiskit.transpiler.passes.layout import vf2_utils
 
 logger = logging.getLogger(__name__)
 
+_TRIAL_BATCH_SIZE = 1024
+# The lower bound of the call limit derived from the default trial limit, which is the call limit
+# used by optimization level 1
+_MIN_DEFAULT_CALL_LIMIT = int(5e4)
+
 
 class VF2LayoutStopReason(Enum):
     """Stop reasons for VF2Layout pass."""
@@ -71,7 +77,10 @@ class VF2Layout(AnalysisPass):
                                      Default is False.
             seed (int): Sets the seed of the PRNG. -1 Means no node shuffling.
             call_limit (int): The number of state visits to attempt in each execution of
-                VF2.
+                VF2. If this is not specified and the number of trials is limited by default
+                (see ``max_trials``) the number of state visits is also limited, to the
+                default number of trials times the number of qubits in the coupling map or
+                50,000, whichever is larger.
             time_limit (float): The total time limit in seconds to run ``VF2Layout``
             properties (BackendProperties): The backend properties for the backend. If
                 :meth:`~qiskit.providers.models.BackendProperties.readout_error` is available
@@ -79,7 +88,8 @@ class VF2Layout(AnalysisPass):
             max_trials (int): The maximum number of trials to run VF2 to find
                 a layout. If this is not specified the number of trials will be limited
                 based on the number of edges in the interaction graph or the coupling graph
-                (whichever is larger) if no other limits are set. If set to a value <= 0 no
+                (whichever is larger), along with the number of state visits in VF2 (see
+                ``call_limit``), if no other limits are set. If set to a value <= 0 no
                 limit on the number of trials will be set.
             target (Target): A target representing the backend device to run ``VF2Layout`` on.
                 If specified it will supersede a set value for ``properties`` and
@@ -101,6 +111,7 @@ class VF2Layout(AnalysisPass):
         self.time_limit = time_limit
         self.max_trials = max_trials
         self.avg_error_map = None
+        self._error_arrays = None
 
     def run(self, dag):
         """run the layout method"""
@@ -110,88 +121,236 @@ class VF2Layout(AnalysisPass):
             self.avg_error_map = vf2_utils.build_average_error_map(
                 self.target, self.properties, self.coupling_map
             )
+        # The arrays used for scoring are built from ``avg_error_map`` and kept along with the
+        # map they were built from, so they're rebuilt if a different map is set on the pass.
+        if self._error_arrays is None or self._error_arrays[0] is not self.avg_error_map:
+            self._error_arrays = (
+                self.avg_error_map,
+                vf2_utils.build_error_arrays(
+                    self.avg_error_map, self.coupling_map.size(), self.strict_direction
+                ),
+            )
 
-        result = vf2_utils.build_interaction_graph(dag, self.strict_direction)
+        result = vf2_utils.build_interaction_graph(dag, self.strict_direction, return_arrays=True)
         if result is None:
             self.property_set["VF2Layout_stop_reason"] = VF2LayoutStopReason.MORE_THAN_2Q
             return
-        im_graph, im_graph_node_map, reverse_im_graph_node_map = result
+        im_graph, _, reverse_im_graph_node_map, interaction_arrays = result
         cm_graph, cm_nodes = vf2_utils.shuffle_coupling_graph(
             self.coupling_map, self.seed, self.strict_direction
         )
         # To avoid trying to over optimize the result by default limit the number
         # of trials based on the size of the graphs. For circuits with simple layouts
         # like an all 1q circuit we don't want to sit forever trying every possible
-        # mapping in the search space if no other limits are set
+        # mapping in the search space if no other limits are set. The default limits are only
+        # used for this run so that every run of the pass gets the same defaults.
+        max_trials = self.max_trials
+        call_limit = self.call_limit
         if self.max_trials is None and self.call_limit is None and self.time_limit is None:
-            im_graph_edge_count = len(im_graph.edge_list())
-            cm_graph_edge_count = len(self.coupling_map.graph.edge_list())
-            self.max_trials = max(im_graph_edge_count, cm_graph_edge_count) + 15
+            im_graph_edge_count = im_graph.num_edges()
+            cm_graph_edge_count = self.coupling_map.graph.num_edges()
+            max_trials = max(im_graph_edge_count, cm_graph_edge_count) + 15
+            # Also bound the number of states VF2 visits so the search stops in rustworkx
+            # instead of producing mappings past the trial limit that would be discarded.
+            call_limit = max(max_trials * len(cm_graph), _MIN_DEFAULT_CALL_LIMIT)
 
+        cm_nodes_array = np.asarray(cm_nodes, dtype=np.int64)
+        chosen_mapping = None
+        # If the graphs have the same number of nodes and edges any subgraph mapping is also a
+        # graph isomorphism, so run the more restrictive isomorphism search instead which prunes
+        # the search space much faster. As the score heuristic currently doesn't weigh nodes based
+        # on gates on a qubit the scores for all mappings would be the same so there is no need to
+        # score or to run multiple trials here.
+        if len(cm_graph) == len(im_graph) and cm_graph.num_edges() == im_graph.num_edges():
+            logger.debug("Running VF2 to find an isomorphic mapping")
+            mappings = vf2_mapping(
+                cm_graph,
+                im_graph,
+                subgraph=False,
+                id_order=False,
+                induced=True,
+                call_limit=call_limit,
+            )
+            mapping = next(mappings, None)
+            if mapping is not None:
+                chosen_mapping = vf2_utils.split_mapping(mapping)
+        else:
+            # If the circuit is made of independent groups of interacting qubits search for each
+            # group separately as VF2 handles disconnected graphs poorly. If that greedy placement
+            # fails fall back to searching for the whole interaction graph at once. All of the
+            # searches share the configured time limit.
+            start_ns = time.monotonic_ns()
+            components = vf2_utils.split_interaction_graph(im_graph)
+            if sum(1 for component in components if component.num_edges()) > 1:
+                chosen_mapping = self._map_components(
+                    cm_graph,
+                    cm_nodes_array,
+                    components,
+                    interaction_arrays,
+                    max_trials,
+                    call_limit,
+                    start_ns,
+                )
+            if chosen_mapping is None:
+                chosen_mapping = self._score_mappings(
+                    cm_graph,
+                    cm_nodes_array,
+                    im_graph,
+                    interaction_arrays,
+                    max_trials,
+                    call_limit,
+                    start_ns,
+                )
+        if chosen_mapping is None:
+            stop_reason = VF2LayoutStopReason.NO_SOLUTION_FOUND
+        else:
+            stop_reason = VF2LayoutStopReason.SOLUTION_FOUND
+            self.property_set["layout"] = vf2_utils.build_layout(
+                chosen_mapping, cm_nodes_array, reverse_im_graph_node_map
+            )
+            for reg in dag.qregs.values():
+                self.property_set["layout"].add_register(reg)
+
+        self.property_set["VF2Layout_stop_reason"] = stop_reason
+
+    def _map_components(
+        self,
+        cm_graph,
+        cm_nodes_array,
+        components,
+        interaction_arrays,
+        max_trials,
+        call_limit,
+        start_ns,
+    ):
+        """Map each connected component of the interaction graph onto the physical qubits left
+        unused by the previous components and return the combined mapping."""
+        remaining_cm_graph = cm_graph.copy()
+        cm_indices = []
+        im_indices = []
+        for component in components:
+            mapping = self._score_mappings(
+                remaining_cm_graph,
+                cm_nodes_array,
+                component,
+                vf2_utils.component_interaction_arrays(interaction_arrays, component),
+                max_trials,
+                call_limit,
+                start_ns,
+            )
+            if mapping is None:
+                logger.debug("Unable to map components separately")
+                return None
+            cm_indices.append(mapping[0])
+            im_indices.append(mapping[1])
+            remaining_cm_graph.remove_nodes_from(mapping[0].tolist())
+        return np.concatenate(cm_indices), np.concatenate(im_indices)
+
+    def _score_mappings(
+        self,
+        cm_graph,
+        cm_nodes_array,
+        im_graph,
+        interaction_arrays,
+        max_trials,
+        call_limit,
+        start_ns,
+    ):
+        """Search for subgraph mappings and return the lowest scoring one, split into arrays
+        with :func:`.vf2_utils.split_mapping`. The mappings are scored with the gate counts in
+        ``interaction_arrays`` from :func:`.vf2_utils.build_interaction_graph`, at most
+        ``max_trials`` mappings are tried and VF2 stops after visiting ``call_limit`` states.
+        The time limit is counted from ``start_ns``, the :func:`time.monotonic_ns` time the
+        search for the layout started."""
         logger.debug("Running VF2 to find mappings")
+        # With id_order=False rustworkx picks the node matching order itself using the VF2++
+        # heuristic (highest degree and rarest nodes first), so the node indices of the
+        # interaction graph don't affect how quickly the search is pruned.
         mappings = vf2_mapping(
             cm_graph,
             im_graph,
             subgraph=True,
             id_order=False,
             induced=False,
-            call_limit=self.call_limit,
+            call_limit=call_limit,
         )
-        chosen_layout = None
-        chosen_layout_score = None
-        start_time = time.time()
-        trials = 0
-        for mapping in mappings:
-            trials += 1
-            logger.debug("Running trial: %s", trials)
-            stop_reason = VF2LayoutStopReason.SOLUTION_FOUND
-            layout = Layout(
-                {reverse_im_graph_node_map[im_i]: cm_nodes[cm_i] for cm_i, im_i in mapping.items()}
+        # If the graphs have the same number of nodes we don't need to score or do multiple
+        # trials as the score heuristic currently doesn't weigh nodes based on gates on a
+        # qubit so the scores will always all be the same. Similarly if only a single trial
+        # is allowed there is nothing to compare the score against.
+        if len(cm_graph) == len(im_graph) or max_trials == 1:
+            mapping = next(mappings, None)
+            if mapping is None:
+                return None
+            logger.debug("Running trial: %s", 1)
+            if max_trials == 1:
+                logger.debug("Trial %s is >= configured max trials %s", 1, max_trials)
+            return vf2_utils.split_mapping(mapping)
+        if max_trials is not None and max_trials > 0:
+            mappings = itertools.islice(mappings, max_trials)
+        debug = logger.isEnabledFor(logging.DEBUG)
+        chosen_mapping = None
+        chosen_mapping_score = None
+        # Mappings are collected into fixed size batches which are scored together, in parallel
+        # for larger batches, and reduced with argmin. This also avoids keeping every mapping
+        # alive if the number of trials is unbounded.
+        batch_size = _TRIAL_BATCH_SIZE
+        if max_trials is not None and max_trials > 0:
+            batch_size = min(batch_size, max_trials)
+        batch_mappings = []
+        batch_layouts = np.zeros((batch_size, len(interaction_arrays[0])), dtype=np.int64)
+
+        def score_batch(chosen_mapping, chosen_mapping_score):
+            batch_scores = vf2_utils.score_layouts(
+                batch_layouts[: len(batch_mappings)], interaction_arrays, self._error_arrays[1]
             )
-            # If the graphs have the same number of nodes we don't need to score or do multiple
-            # trials as the score heuristic currently doesn't weigh nodes based on gates on a
-            # qubit so the scores will always all be the same
-            if len(cm_graph) == len(im_graph):
-                chosen_layout = layout
-                break
-            layout_score = vf2_utils.score_layout(
-                self.avg_error_map,
-                layout,
-                im_graph_node_map,
-                reverse_im_graph_node_map,
-                im_graph,
-                self.strict_direction,
+            if debug:
+                first_trial = trials - len(batch_mappings) + 1
+                for trial, score in enumerate(batch_scores, start=first_trial):
+                    logger.debug("Trial %s has score %s", trial, score)
+            return _lowest_scoring(
+                batch_mappings, batch_scores, chosen_mapping, chosen_mapping_score
             )
-            logger.debug("Trial %s has score %s", trials, layout_score)
-            if chosen_layout is None:
-                chosen_layout = layout
-                chosen_layout_score = layout_score
-            elif layout_score < chosen_layout_score:
-                logger.debug(
-                    "Found layout %s has a lower score (%s) than previous best %s (%s)",
-                    layout,
-                    layout_score,
-                    chosen_layout,
-                    chosen_layout_score,
-                )
-                chosen_layout = layout
-                chosen_layout_score = layout_score
-            if self.max_trials is not None and self.max_trials > 0 and trials >= self.max_trials:
-                logger.debug("Trial %s is >= configured max trials %s", trials, self.max_trials)
-                break
-            elapsed_time = time.time() - start_time
-            if self.time_limit is not None and elapsed_time >= self.time_limit:
-                logger.debug(
-                    "VF2Layout has taken %s which exceeds configured max time: %s",
-                    elapsed_time,
-                    self.time_limit,
+
+        if self.time_limit is not None:
+            deadline_ns = start_ns + int(self.time_limit * 1e9)
+        else:
+            deadline_ns = None
+        trials = 0
+        for trials, mapping in enumerate(mappings, start=1):
+            if debug:
+                logger.debug("Running trial: %s", trials)
+            mapping = vf2_utils.split_mapping(mapping)
+            vf2_utils.fill_layout_array(mapping, cm_nodes_array, batch_layouts[len(batch_mappings)])
+            batch_mappings.append(mapping)
+            if len(batch_mappings) == batch_size:
+                chosen_mapping, chosen_mapping_score = score_batch(
+                    chosen_mapping, chosen_mapping_score
                 )
-                break
-        if chosen_layout is None:
-            stop_reason = VF2LayoutStopReason.NO_SOLUTION_FOUND
+                batch_mappings = []
+            if deadline_ns is not None:
+                now_ns = time.monotonic_ns()
+                if now_ns >= deadline_ns:
+                    logger.debug(
+                        "VF2Layout has taken %s which exceeds configured max time: %s",
+                        (now_ns - start_ns) / 1e9,
+                        self.time_limit,
+                    )
+                    break
         else:
-            self.property_set["layout"] = chosen_layout
-            for reg in dag.qregs.values():
-                self.property_set["layout"].add_register(reg)
+            if max_trials is not None and trials == max_trials:
+                logger.debug("Trial %s is >= configured max trials %s", trials, max_trials)
+        if batch_mappings:
+            chosen_mapping, chosen_mapping_score = score_batch(chosen_mapping, chosen_mapping_score)
+        if chosen_mapping is not None:
+            logger.debug("Lowest score found after %s trials is %s", trials, chosen_mapping_score)
+        return chosen_mapping
 
-        self.property_set["VF2Layout_stop_reason"] = stop_reason
+
+def _lowest_scoring(mappings, scores, chosen_mapping, chosen_mapping_score):
+    """Return the lowest scoring of a batch of mappings and the best mapping found so far,
+    along with its score."""
+    index = int(np.argmin(scores))
+    if chosen_mapping is None or scores[index] < chosen_mapping_score:
+        return mappings[index], float(scores[index])
+    return chosen_mapping, chosen_mapping_score
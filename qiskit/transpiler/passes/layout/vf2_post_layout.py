@@ -181,7 +181,7 @@ class VF2PostLayout(AnalysisPass):
                 call_limit=self.call_limit,
             )
         chosen_layout = None
-        initial_layout = Layout(dict(enumerate(dag.qubits)))
+        initial_layout = Layout(dict(enumerate(dag.qubits))).get_virtual_bits()
         try:
             if self.strict_direction:
                 chosen_layout_score = self._score_layout(
@@ -211,9 +211,9 @@ class VF2PostLayout(AnalysisPass):
             trials += 1
             logger.debug("Running trial: %s", trials)
             stop_reason = VF2PostLayoutStopReason.SOLUTION_FOUND
-            layout = Layout(
-                {reverse_im_graph_node_map[im_i]: cm_nodes[cm_i] for cm_i, im_i in mapping.items()}
-            )
+            layout = {
+                reverse_im_graph_node_map[im_i]: cm_nodes[cm_i] for cm_i, im_i in mapping.items()
+            }
             if self.strict_direction:
                 layout_score = self._score_layout(
                     layout, im_graph_node_map, reverse_im_graph_node_map, im_graph
@@ -230,10 +230,9 @@ class VF2PostLayout(AnalysisPass):
             logger.debug("Trial %s has score %s", trials, layout_score)
             if layout_score < chosen_layout_score:
                 logger.debug(
-                    "Found layout %s has a lower score (%s) than previous best %s (%s)",
-                    layout,
+                    "Trial %s has a lower score (%s) than the previous best (%s)",
+                    trials,
                     layout_score,
-                    chosen_layout,
                     chosen_layout_score,
                 )
                 chosen_layout = layout
@@ -249,6 +248,8 @@ class VF2PostLayout(AnalysisPass):
         if chosen_layout is None:
             stop_reason = VF2PostLayoutStopReason.NO_SOLUTION_FOUND
         else:
+            # Scoring only needs the plain dict so only build a Layout for the winning mapping
+            chosen_layout = Layout(chosen_layout)
             existing_layout = self.property_set["layout"]
             # If any ancillas in initial layout map them back to the final layout output
             if existing_layout is not None and len(existing_layout) > len(chosen_layout):
@@ -269,19 +270,18 @@ class VF2PostLayout(AnalysisPass):
         self.property_set["VF2PostLayout_stop_reason"] = stop_reason
 
     def _score_layout(self, layout, bit_map, reverse_bit_map, im_graph):
-        bits = layout.get_virtual_bits()
         fidelity = 1
         if self.target is not None:
             for bit, node_index in bit_map.items():
                 gate_counts = im_graph[node_index]
                 for gate, count in gate_counts.items():
                     if self.target[gate] is not None and None not in self.target[gate]:
-                        props = self.target[gate][(bits[bit],)]
+                        props = self.target[gate][(layout[bit],)]
                         if props is not None and props.error is not None:
                             fidelity *= (1 - props.error) ** count
 
             for edge in im_graph.edge_index_map().values():
-                qargs = (bits[reverse_bit_map[edge[0]]], bits[reverse_bit_map[edge[1]]])
+                qargs = (layout[reverse_bit_map[edge[0]]], layout[reverse_bit_map[edge[1]]])
                 gate_counts = edge[2]
                 for gate, count in gate_counts.items():
                     if self.target[gate] is not None and None not in self.target[gate]:
@@ -294,16 +294,16 @@ class VF2PostLayout(AnalysisPass):
                 for gate, count in gate_counts.items():
                     if gate == "measure":
                         try:
-                            fidelity *= (1 - self.properties.readout_error(bits[bit])) ** count
+                            fidelity *= (1 - self.properties.readout_error(layout[bit])) ** count
                         except BackendPropertyError:
                             pass
                     else:
                         try:
-                            fidelity *= (1 - self.properties.gate_error(gate, bits[bit])) ** count
+                            fidelity *= (1 - self.properties.gate_error(gate, layout[bit])) ** count
                         except BackendPropertyError:
                             pass
             for edge in im_graph.edge_index_map().values():
-                qargs = (bits[reverse_bit_map[edge[0]]], bits[reverse_bit_map[edge[1]]])
+                qargs = (layout[reverse_bit_map[edge[0]]], layout[reverse_bit_map[edge[1]]])
                 gate_counts = edge[2]
                 for gate, count in gate_counts.items():
                     try:
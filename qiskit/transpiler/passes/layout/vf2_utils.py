@@ -16,17 +16,33 @@ from collections import defaultdict
 import statistics
 import random
 
+import numpy as np
+import rustworkx
 from rustworkx import PyDiGraph, PyGraph
 
 from qiskit.circuit import ControlFlowOp, ForLoopOp
 from qiskit.converters import circuit_to_dag
+from qiskit.transpiler.layout import Layout
+from qiskit._accelerate import vf2_layout as vf2_layout_rs  # pylint: disable=import-error
 
 
-def build_interaction_graph(dag, strict_direction=True):
-    """Build an interaction graph from a dag."""
+def build_interaction_graph(dag, strict_direction=True, return_arrays=False):
+    """Build an interaction graph from a dag.
+
+    If ``return_arrays`` is ``True`` a fourth element is added to the returned tuple with arrays
+    of the gate count on each node, the source and target node of each edge and the gate count
+    on each edge, which are used for scoring layouts with :func:`score_layouts`.
+    """
     im_graph = PyDiGraph(multigraph=False) if strict_direction else PyGraph(multigraph=False)
     im_graph_node_map = {}
     reverse_im_graph_node_map = {}
+    # Nodes and edges are never removed while building the graph so their indices are the
+    # positions in these lists
+    node_counts = []
+    edge_index_map = {}
+    edge_sources = []
+    edge_targets = []
+    edge_counts = []
 
     class MultiQEncountered(Exception):
         """Used to singal an error-status return from the DAG visitor."""
@@ -52,22 +68,33 @@ def build_interaction_graph(dag, strict_direction=True):
                     weights[node.name] += weight
                     im_graph_node_map[qargs[0]] = im_graph.add_node(weights)
                     reverse_im_graph_node_map[im_graph_node_map[qargs[0]]] = qargs[0]
+                    node_counts.append(weight)
                 else:
                     im_graph[im_graph_node_map[qargs[0]]][node.op.name] += weight
+                    node_counts[im_graph_node_map[qargs[0]]] += weight
             if len_args == 2:
                 if qargs[0] not in im_graph_node_map:
                     im_graph_node_map[qargs[0]] = im_graph.add_node(defaultdict(int))
                     reverse_im_graph_node_map[im_graph_node_map[qargs[0]]] = qargs[0]
+                    node_counts.append(0)
                 if qargs[1] not in im_graph_node_map:
                     im_graph_node_map[qargs[1]] = im_graph.add_node(defaultdict(int))
                     reverse_im_graph_node_map[im_graph_node_map[qargs[1]]] = qargs[1]
+                    node_counts.append(0)
                 edge = (im_graph_node_map[qargs[0]], im_graph_node_map[qargs[1]])
                 if im_graph.has_edge(*edge):
                     im_graph.get_edge_data(*edge)[node.name] += weight
+                    # An undirected graph matches the edge in either direction
+                    if edge not in edge_index_map:
+                        edge = (edge[1], edge[0])
+                    edge_counts[edge_index_map[edge]] += weight
                 else:
                     weights = defaultdict(int)
                     weights[node.name] += weight
-                    im_graph.add_edge(*edge, weights)
+                    edge_index_map[edge] = im_graph.add_edge(*edge, weights)
+                    edge_sources.append(edge[0])
+                    edge_targets.append(edge[1])
+                    edge_counts.append(weight)
             if len_args > 2:
                 raise MultiQEncountered()
 
@@ -75,19 +102,25 @@ def build_interaction_graph(dag, strict_direction=True):
         _visit(dag, 1, {bit: bit for bit in dag.qubits})
     except MultiQEncountered:
         return None
+    if return_arrays:
+        interaction_arrays = tuple(
+            np.asarray(values, dtype=np.int64)
+            for values in (node_counts, edge_sources, edge_targets, edge_counts)
+        )
+        return im_graph, im_graph_node_map, reverse_im_graph_node_map, interaction_arrays
     return im_graph, im_graph_node_map, reverse_im_graph_node_map
 
 
 def score_layout(avg_error_map, layout, bit_map, reverse_bit_map, im_graph, strict_direction=False):
-    """Score a layout given an average error map."""
-    bits = layout.get_virtual_bits()
+    """Score a layout, given as a dict mapping virtual bits to physical qubits, with an average
+    error map."""
     fidelity = 1
     for bit, node_index in bit_map.items():
         gate_count = sum(im_graph[node_index].values())
-        fidelity *= (1 - avg_error_map[(bits[bit],)]) ** gate_count
+        fidelity *= (1 - avg_error_map[(layout[bit],)]) ** gate_count
     for edge in im_graph.edge_index_map().values():
         gate_count = sum(edge[2].values())
-        qargs = (bits[reverse_bit_map[edge[0]]], bits[reverse_bit_map[edge[1]]])
+        qargs = (layout[reverse_bit_map[edge[0]]], layout[reverse_bit_map[edge[1]]])
         if not strict_direction and qargs not in avg_error_map:
             qargs = (qargs[1], qargs[0])
         fidelity *= (1 - avg_error_map[qargs]) ** gate_count
@@ -147,3 +180,101 @@ def shuffle_coupling_graph(coupling_map, seed, strict_direction=True):
         cm_nodes = [k for k, v in sorted(enumerate(cm_nodes), key=lambda item: item[1])]
         cm_graph = shuffled_cm_graph
     return cm_graph, cm_nodes
+
+
+def split_interaction_graph(im_graph):
+    """Split an interaction graph into its connected components.
+
+    Each component is returned as a copy of the interaction graph with the nodes of all other
+    components removed, so node indices are the same as in ``im_graph``. The components are
+    sorted from largest to smallest.
+    """
+    if isinstance(im_graph, PyDiGraph):
+        components = rustworkx.weakly_connected_components(im_graph)
+    else:
+        components = rustworkx.connected_components(im_graph)
+    components.sort(key=len, reverse=True)
+    subgraphs = []
+    for component in components:
+        subgraph = im_graph.copy()
+        subgraph.remove_nodes_from(
+            [node for node in im_graph.node_indexes() if node not in component]
+        )
+        subgraphs.append(subgraph)
+    return subgraphs
+
+
+def build_error_arrays(avg_error_map, num_qubits, strict_direction=False):
+    """Build arrays of the average errors for scoring layouts with :func:`score_layouts`.
+
+    Returns a tuple of a 1d array of the error on each physical qubit and a 2d array of the
+    error on each pair of physical qubits. Qubits and edges without an error in
+    ``avg_error_map`` are treated as having no error and entries for qubits outside of
+    ``range(num_qubits)`` are ignored.
+    """
+    node_errors = np.zeros(num_qubits, dtype=np.float64)
+    edge_errors = np.full((num_qubits, num_qubits), np.nan, dtype=np.float64)
+    for qargs, error in avg_error_map.items():
+        if any(qubit >= num_qubits for qubit in qargs):
+            continue
+        if len(qargs) == 1:
+            node_errors[qargs[0]] = error
+        elif len(qargs) == 2:
+            edge_errors[qargs] = error
+    if not strict_direction:
+        edge_errors = np.where(np.isnan(edge_errors), edge_errors.T, edge_errors)
+    return node_errors, np.nan_to_num(edge_errors, nan=0.0)
+
+
+def component_interaction_arrays(interaction_arrays, component):
+    """Restrict the arrays from :func:`build_interaction_graph` to the nodes and edges of a
+    component returned by :func:`split_interaction_graph`."""
+    node_counts, edge_sources, edge_targets, edge_counts = interaction_arrays
+    in_component = np.zeros(len(node_counts), dtype=bool)
+    in_component[list(component.node_indexes())] = True
+    in_edges = in_component[edge_sources]
+    return (
+        np.where(in_component, node_counts, 0),
+        edge_sources[in_edges],
+        edge_targets[in_edges],
+        edge_counts[in_edges],
+    )
+
+
+def split_mapping(mapping):
+    """Split a mapping returned by VF2 into arrays of the coupling graph node indices and the
+    interaction graph node indices they're mapped to."""
+    count = len(mapping)
+    return (
+        np.fromiter(mapping.keys(), dtype=np.int64, count=count),
+        np.fromiter(mapping.values(), dtype=np.int64, count=count),
+    )
+
+
+def fill_layout_array(mapping, cm_nodes_array, out):
+    """Write the physical qubit each interaction graph node is mapped to by a mapping from
+    :func:`split_mapping` into ``out``, indexed by the interaction graph node index."""
+    cm_indices, im_indices = mapping
+    out[im_indices] = cm_nodes_array[cm_indices]
+    return out
+
+
+def build_layout(mapping, cm_nodes_array, reverse_bit_map):
+    """Build a :class:`.Layout` from a mapping from :func:`split_mapping`."""
+    cm_indices, im_indices = mapping
+    return Layout(
+        dict(
+            zip(
+                [reverse_bit_map[im_i] for im_i in im_indices.tolist()],
+                cm_nodes_array[cm_indices].tolist(),
+            )
+        )
+    )
+
+
+def score_layouts(layouts, interaction_arrays, error_arrays):
+    """Score a 2D array of layouts built with :func:`fill_layout_array`, one per row.
+
+    Returns an array of the score of each layout, computed in parallel for larger batches.
+    """
+    return vf2_layout_rs.score_layouts(layouts, *interaction_arrays, *error_arrays)
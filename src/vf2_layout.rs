@@ -0,0 +1,125 @@
+// This code is part of Qiskit.
+//
+// (C) Copyright IBM 2022
+//
+// This code is licensed under the Apache License, Version 2.0. You may
+// obtain a copy of this license in the LICENSE.txt file in the root directory
+// of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+//
+// Any modifications or derivative works of this code must retain this
+// copyright notice, and modified files need to carry a notice indicating
+// that they have been altered from the originals.
+
+use ndarray::prelude::*;
+use numpy::{IntoPyArray, PyReadonlyArray1, PyReadonlyArray2};
+use pyo3::prelude::*;
+use pyo3::wrap_pyfunction;
+use pyo3::Python;
+use rayon::prelude::*;
+
+use crate::getenv_use_multiple_threads;
+
+const PARALLEL_THRESHOLD: usize = 64;
+
+fn score(
+    layout: ArrayView1<i64>,
+    node_counts: ArrayView1<i64>,
+    edge_sources: ArrayView1<i64>,
+    edge_targets: ArrayView1<i64>,
+    edge_counts: ArrayView1<i64>,
+    node_errors: ArrayView1<f64>,
+    edge_errors: ArrayView2<f64>,
+) -> f64 {
+    let node_fidelity = node_counts
+        .iter()
+        .zip(layout.iter())
+        .fold(1., |acc, (count, qubit)| {
+            acc * (1. - node_errors[*qubit as usize]).powi(*count as i32)
+        });
+    let edge_fidelity = edge_sources
+        .iter()
+        .zip(edge_targets.iter())
+        .zip(edge_counts.iter())
+        .fold(1., |acc, ((source, target), count)| {
+            let qargs = [
+                layout[*source as usize] as usize,
+                layout[*target as usize] as usize,
+            ];
+            acc * (1. - edge_errors[qargs]).powi(*count as i32)
+        });
+    1. - node_fidelity * edge_fidelity
+}
+
+/// Score a batch of mappings of interaction graph nodes onto physical qubits.
+///
+/// If there are enough mappings in the batch they are scored in parallel.
+///
+/// Args:
+///     layouts (numpy.ndarray): A 2D array with one mapping per row, where each
+///         row is the physical qubit each interaction graph node is mapped to,
+///         indexed by the node index.
+///     node_counts (numpy.ndarray): The number of gates on each interaction
+///         graph node.
+///     edge_sources (numpy.ndarray): The source node of each interaction graph
+///         edge.
+///     edge_targets (numpy.ndarray): The target node of each interaction graph
+///         edge.
+///     edge_counts (numpy.ndarray): The number of gates on each interaction
+///         graph edge.
+///     node_errors (numpy.ndarray): The average error on each physical qubit.
+///     edge_errors (numpy.ndarray): The average error on each pair of physical
+///         qubits.
+///
+/// Returns:
+///     numpy.ndarray: The estimated error rate of running the circuit with each
+///     mapping.
+#[pyfunction]
+#[pyo3(
+    text_signature = "(layouts, node_counts, edge_sources, edge_targets, edge_counts, node_errors, edge_errors, /)"
+)]
+pub fn score_layouts(
+    py: Python,
+    layouts: PyReadonlyArray2<i64>,
+    node_counts: PyReadonlyArray1<i64>,
+    edge_sources: PyReadonlyArray1<i64>,
+    edge_targets: PyReadonlyArray1<i64>,
+    edge_counts: PyReadonlyArray1<i64>,
+    node_errors: PyReadonlyArray1<f64>,
+    edge_errors: PyReadonlyArray2<f64>,
+) -> PyObject {
+    let layouts = layouts.as_array();
+    let node_counts = node_counts.as_array();
+    let edge_sources = edge_sources.as_array();
+    let edge_targets = edge_targets.as_array();
+    let edge_counts = edge_counts.as_array();
+    let node_errors = node_errors.as_array();
+    let edge_errors = edge_errors.as_array();
+    let score_fn = |layout: ArrayView1<i64>| -> f64 {
+        score(
+            layout,
+            node_counts,
+            edge_sources,
+            edge_targets,
+            edge_counts,
+            node_errors,
+            edge_errors,
+        )
+    };
+    let scores: Vec<f64> = if layouts.nrows() < PARALLEL_THRESHOLD || !getenv_use_multiple_threads()
+    {
+        layouts.axis_iter(Axis(0)).map(score_fn).collect()
+    } else {
+        layouts
+            .axis_iter(Axis(0))
+            .into_par_iter()
+            .map(score_fn)
+            .collect()
+    };
+    scores.into_pyarray(py).into()
+}
+
+#[pymodule]
+pub fn vf2_layout(_py: Python, m: &PyModule) -> PyResult<()> {
+    m.add_wrapped(wrap_pyfunction!(score_layouts))?;
+    Ok(())
+}
@@ -12,6 +12,7 @@
 
 """Test the VF2Layout pass"""
 
+import itertools
 import unittest
 from math import pi
 
@@ -22,6 +23,7 @@ import rustworkx
 from qiskit import QuantumRegister, QuantumCircuit, ClassicalRegister
 from qiskit.circuit import ControlFlowOp
 from qiskit.transpiler import CouplingMap, Target, TranspilerError
+from qiskit.transpiler.passes.layout import vf2_utils
 from qiskit.transpiler.passes.layout.vf2_layout import VF2Layout, VF2LayoutStopReason
 from qiskit.converters import circuit_to_dag
 from qiskit.test import QiskitTestCase
@@ -194,6 +196,57 @@ class TestVF2LayoutSimple(LayoutTestCase):
             pass_.property_set["VF2Layout_stop_reason"], VF2LayoutStopReason.NO_SOLUTION_FOUND
         )
 
+    def test_same_size_isomorphic(self):
+        """Test a circuit with the same interaction graph as the coupling map is laid out."""
+        cmap = CouplingMap([[0, 1], [1, 2], [2, 3], [3, 0]])
+
+        qr = QuantumRegister(4, "qr")
+        circuit = QuantumCircuit(qr)
+        circuit.cx(qr[0], qr[2])  # qr0 -> qr2
+        circuit.cx(qr[2], qr[1])  # qr2 -> qr1
+        circuit.cx(qr[1], qr[3])  # qr1 -> qr3
+        circuit.cx(qr[3], qr[0])  # qr3 -> qr0
+
+        dag = circuit_to_dag(circuit)
+        pass_ = VF2Layout(cmap, seed=self.seed)
+        pass_.run(dag)
+        self.assertLayout(dag, cmap, pass_.property_set)
+
+    def test_same_size_fewer_edges(self):
+        """Test a circuit with as many qubits as the coupling map but fewer 2q interactions."""
+        cmap = CouplingMap([[0, 1], [1, 2], [2, 3], [3, 0]])
+
+        qr = QuantumRegister(4, "qr")
+        circuit = QuantumCircuit(qr)
+        circuit.cx(qr[0], qr[2])  # qr0 -> qr2
+        circuit.cx(qr[2], qr[1])  # qr2 -> qr1
+        circuit.cx(qr[1], qr[3])  # qr1 -> qr3
+
+        dag = circuit_to_dag(circuit)
+        pass_ = VF2Layout(cmap, seed=self.seed)
+        pass_.run(dag)
+        self.assertLayout(dag, cmap, pass_.property_set)
+
+    @ddt.data(True, False)
+    def test_disconnected_components(self, strict_direction):
+        """Test a circuit with independent groups of interacting qubits is laid out."""
+        cmap = CouplingMap.from_heavy_hex(3)
+
+        qr = QuantumRegister(9, "qr")
+        circuit = QuantumCircuit(qr)
+        circuit.cx(qr[0], qr[5])
+        circuit.cx(qr[5], qr[2])
+        circuit.cx(qr[2], qr[7])
+        circuit.cx(qr[1], qr[3])
+        circuit.cx(qr[3], qr[8])
+        circuit.cx(qr[4], qr[6])
+
+        dag = circuit_to_dag(circuit)
+        pass_ = VF2Layout(cmap, strict_direction=strict_direction, seed=self.seed)
+        pass_.run(dag)
+        self.assertLayout(dag, cmap, pass_.property_set, strict_direction=strict_direction)
+        self.assertEqual(len(set(pass_.property_set["layout"].get_physical_bits())), 9)
+
     def test_coupling_map_and_target(self):
         """Test that a Target is used instead of a CouplingMap if both are specified."""
         cmap = CouplingMap([[0, 1], [1, 2]])
@@ -508,6 +561,107 @@ class TestMultipleTrials(QiskitTestCase):
         vf2_pass(qc, property_set)
         self.assertEqual(set(property_set["layout"].get_physical_bits()), {1, 3})
 
+    def test_score_layouts_matches_score_layout(self):
+        """Test scoring a batch of layouts from arrays matches scoring the equivalent layouts."""
+        backend = FakeManhattan()
+        cmap = CouplingMap(backend.configuration().coupling_map)
+        avg_error_map = vf2_utils.build_average_error_map(None, backend.properties(), cmap)
+        qr = QuantumRegister(3)
+        qc = QuantumCircuit(qr)
+        qc.h(qr[0])
+        qc.cx(qr[0], qr[1])
+        qc.cx(qr[1], qr[2])
+        qc.cx(qr[1], qr[2])
+        qc.measure_all()
+        result = vf2_utils.build_interaction_graph(
+            circuit_to_dag(qc), strict_direction=False, return_arrays=True
+        )
+        im_graph, bit_map, reverse_bit_map, interaction_arrays = result
+        cm_graph, cm_nodes = vf2_utils.shuffle_coupling_graph(cmap, 42, strict_direction=False)
+        cm_nodes_array = numpy.asarray(cm_nodes)
+        error_arrays = vf2_utils.build_error_arrays(avg_error_map, cmap.size())
+        # Enough mappings that the batch is scored in parallel
+        mappings = list(
+            itertools.islice(
+                rustworkx.vf2_mapping(cm_graph, im_graph, subgraph=True, induced=False), 100
+            )
+        )
+        self.assertEqual(len(mappings), 100)
+        layouts = numpy.zeros((len(mappings), len(interaction_arrays[0])), dtype=numpy.int64)
+        for mapping, row in zip(mappings, layouts):
+            vf2_utils.fill_layout_array(vf2_utils.split_mapping(mapping), cm_nodes_array, row)
+        scores = vf2_utils.score_layouts(layouts, interaction_arrays, error_arrays)
+        for mapping, score in zip(mappings, scores):
+            layout = {reverse_bit_map[im_i]: cm_nodes[cm_i] for cm_i, im_i in mapping.items()}
+            expected = vf2_utils.score_layout(
+                avg_error_map, layout, bit_map, reverse_bit_map, im_graph
+            )
+            self.assertAlmostEqual(expected, score)
+
+    def test_lowest_scoring_layout_chosen(self):
+        """Test the layout with the lowest score over several batches of trials is chosen."""
+        backend = FakeYorktown()
+        cmap = CouplingMap(backend.configuration().coupling_map)
+        qr = QuantumRegister(3)
+        qc = QuantumCircuit(qr)
+        qc.h(qr[0])
+        qc.cx(qr[0], qr[1])
+        qc.cx(qr[1], qr[2])
+        qc.measure_all()
+        dag = circuit_to_dag(qc)
+        vf2_pass = VF2Layout(cmap, properties=backend.properties(), seed=42, max_trials=0)
+        property_set = {}
+        with unittest.mock.patch("qiskit.transpiler.passes.layout.vf2_layout._TRIAL_BATCH_SIZE", 3):
+            vf2_pass(qc, property_set)
+        im_graph, bit_map, reverse_bit_map = vf2_utils.build_interaction_graph(
+            dag, strict_direction=False
+        )
+        cm_graph, cm_nodes = vf2_utils.shuffle_coupling_graph(cmap, 42, strict_direction=False)
+        scores = []
+        for mapping in rustworkx.vf2_mapping(cm_graph, im_graph, subgraph=True, induced=False):
+            layout = {reverse_bit_map[im_i]: cm_nodes[cm_i] for cm_i, im_i in mapping.items()}
+            scores.append(
+                vf2_utils.score_layout(
+                    vf2_pass.avg_error_map, layout, bit_map, reverse_bit_map, im_graph
+                )
+            )
+        self.assertGreater(len(scores), 3)
+        chosen_score = vf2_utils.score_layout(
+            vf2_pass.avg_error_map,
+            property_set["layout"].get_virtual_bits(),
+            bit_map,
+            reverse_bit_map,
+            im_graph,
+        )
+        self.assertAlmostEqual(chosen_score, min(scores))
+
+    def test_custom_avg_error_map(self):
+        """Test a custom average error map set on the pass is used for scoring."""
+        cmap = CouplingMap([[0, 1], [1, 2], [2, 3], [3, 4]])
+        qc = QuantumCircuit(2)
+        qc.cx(0, 1)
+        vf2_pass = VF2Layout(cmap, seed=42, max_trials=0)
+        vf2_pass.avg_error_map = {(qubit,): 0.1 for qubit in range(5)}
+        vf2_pass.avg_error_map.update({edge: 0.5 for edge in cmap.get_edges()})
+        vf2_pass.avg_error_map[(2, 3)] = 0.01
+        property_set = {}
+        vf2_pass(qc, property_set)
+        self.assertEqual(set(property_set["layout"].get_physical_bits()), {2, 3})
+        self.assertIsInstance(vf2_pass.avg_error_map, dict)
+
+    def test_properties_with_more_qubits_than_coupling_map(self):
+        """Test errors for qubits outside of the coupling map are ignored."""
+        cmap = CouplingMap([[0, 1], [1, 2], [2, 3]])
+        properties = FakeYorktown().properties()
+        qc = QuantumCircuit(3)
+        qc.cx(0, 1)
+        qc.cx(1, 2)
+        vf2_pass = VF2Layout(cmap, seed=42, properties=properties, max_trials=0)
+        property_set = {}
+        vf2_pass(qc, property_set)
+        self.assertEqual(property_set["VF2Layout_stop_reason"], VF2LayoutStopReason.SOLUTION_FOUND)
+        self.assertTrue(set(property_set["layout"].get_physical_bits()).issubset(range(4)))
+
     def test_max_trials_exceeded(self):
         """Test it exits when max_trials is reached."""
         backend = FakeYorktown()
@@ -550,6 +704,30 @@ class TestMultipleTrials(QiskitTestCase):
 
         self.assertEqual(set(property_set["layout"].get_physical_bits()), {2, 0})
 
+    def test_time_limit_shared_by_components(self):
+        """Test the time limit is for the whole pass when components are mapped separately."""
+        cmap = CouplingMap.from_heavy_hex(3)
+        qc = QuantumCircuit(9)
+        qc.cx(0, 5)
+        qc.cx(5, 2)
+        qc.cx(2, 7)
+        qc.cx(1, 3)
+        qc.cx(3, 8)
+        qc.cx(4, 6)
+        vf2_pass = VF2Layout(cmap, seed=42, time_limit=1.5)
+        property_set = {}
+        # Every read of the clock advances it by a second
+        with unittest.mock.patch("time.monotonic_ns", side_effect=itertools.count(0, 10**9)):
+            with self.assertLogs("qiskit.transpiler.passes.layout.vf2_layout", level="DEBUG") as cm:
+                vf2_pass(qc, property_set)
+        elapsed = [
+            output.split("VF2Layout has taken ")[1].split(" ")[0]
+            for output in cm.output
+            if "VF2Layout has taken" in output
+        ]
+        self.assertEqual(elapsed, ["2.0", "3.0", "4.0"])
+        self.assertEqual(len(set(property_set["layout"].get_physical_bits())), 9)
+
     def test_reasonable_limits_for_simple_layouts(self):
         """Test that the default trials is set to a reasonable number."""
         backend = FakeManhattan()
@@ -561,13 +739,69 @@ class TestMultipleTrials(QiskitTestCase):
         # Run without any limits set
         vf2_pass = VF2Layout(cmap, properties=properties, seed=42)
         property_set = {}
-        with self.assertLogs("qiskit.transpiler.passes.layout.vf2_layout", level="DEBUG") as cm:
-            vf2_pass(qc, property_set)
+        with unittest.mock.patch(
+            "qiskit.transpiler.passes.layout.vf2_layout.vf2_mapping",
+            wraps=rustworkx.vf2_mapping,
+        ) as vf2_mapping:
+            with self.assertLogs("qiskit.transpiler.passes.layout.vf2_layout", level="DEBUG") as cm:
+                vf2_pass(qc, property_set)
         self.assertIn(
             "DEBUG:qiskit.transpiler.passes.layout.vf2_layout:Trial 159 is >= configured max trials 159",
             cm.output,
         )
         self.assertEqual(set(property_set["layout"].get_physical_bits()), {49, 40, 58, 0, 1})
+        # The number of state visits is limited along with the number of trials, but the
+        # derived limit is only used for this run
+        expected_call_limit = max(159 * cmap.size(), int(5e4))
+        self.assertEqual(vf2_mapping.call_count, 1)
+        self.assertEqual(vf2_mapping.call_args.kwargs["call_limit"], expected_call_limit)
+        self.assertIsNone(vf2_pass.call_limit)
+        # The isomorphism search used when the graphs are the same size is limited as well
+        ring = CouplingMap.from_ring(6)
+        ring_qc = QuantumCircuit(6)
+        for qubit in range(6):
+            ring_qc.cx(qubit, (qubit + 1) % 6)
+        vf2_pass = VF2Layout(ring, seed=1)
+        property_set = {}
+        with unittest.mock.patch(
+            "qiskit.transpiler.passes.layout.vf2_layout.vf2_mapping",
+            wraps=rustworkx.vf2_mapping,
+        ) as vf2_mapping:
+            vf2_pass(ring_qc, property_set)
+        self.assertEqual(property_set["VF2Layout_stop_reason"], VF2LayoutStopReason.SOLUTION_FOUND)
+        expected_call_limit = max((ring.graph.num_edges() + 15) * 6, int(5e4))
+        self.assertEqual(vf2_mapping.call_count, 1)
+        self.assertFalse(vf2_mapping.call_args.kwargs["subgraph"])
+        self.assertEqual(vf2_mapping.call_args.kwargs["call_limit"], expected_call_limit)
+
+    def test_default_limits_on_every_run(self):
+        """Test the default limits are used for every run of the same pass."""
+        backend = FakeManhattan()
+        qc = QuantumCircuit(5)
+        qc.h(2)
+        qc.cx(0, 1)
+        cmap = CouplingMap(backend.configuration().coupling_map)
+        vf2_pass = VF2Layout(cmap, properties=backend.properties(), seed=42)
+        with unittest.mock.patch(
+            "qiskit.transpiler.passes.layout.vf2_layout.vf2_mapping",
+            wraps=rustworkx.vf2_mapping,
+        ) as vf2_mapping:
+            with self.assertLogs("qiskit.transpiler.passes.layout.vf2_layout", level="DEBUG") as cm:
+                vf2_pass(qc, {})
+                vf2_pass(qc, {})
+        self.assertEqual(
+            cm.output.count(
+                "DEBUG:qiskit.transpiler.passes.layout.vf2_layout:Trial 159 is >= configured max trials 159"
+            ),
+            2,
+        )
+        expected_call_limit = max(159 * cmap.size(), int(5e4))
+        self.assertEqual(
+            [call.kwargs["call_limit"] for call in vf2_mapping.call_args_list],
+            [expected_call_limit, expected_call_limit],
+        )
+        self.assertIsNone(vf2_pass.max_trials)
+        self.assertIsNone(vf2_pass.call_limit)
 
     def test_no_limits_with_negative(self):
         """Test that we're not enforcing a trial limit if set to negative."""